@@ -0,0 +1,12 @@
+r"""JSON encoding and decoding for Modality requests and responses, using orjson when it is
+installed. dumps returns the encoded document as bytes in either case."""
+try:
+    from orjson import dumps, loads
+except ImportError:
+    import json
+
+    loads = json.loads
+
+    # Compact UTF-8, matching orjson's output
+    def dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
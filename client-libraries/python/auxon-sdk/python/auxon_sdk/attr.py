@@ -1,4 +1,21 @@
 from uuid import UUID
+
+
+def _format_event_coordinate(ec):
+    # Skip the leading zero bytes
+    id_hex = bytes(ec['id']).lstrip(b'\x00').hex()
+    return UUID(ec['timeline_id']).hex + ":" + (id_hex or "0")
+
+
+# Formatters for the tagged (single-key object) forms of AttrVal, keyed by tag
+_TAGGED_ATTR_VAL_FORMATTERS = {
+    'TimelineId': str,
+    'BigInt': str,
+    'Timestamp': str,
+    'EventCoordinate': _format_event_coordinate,
+}
+
+
 def format_json_attr_val(val):
     r"""Produce a human-readable representation of an attribute value
 
@@ -7,30 +24,15 @@ def format_json_attr_val(val):
     if isinstance(val, str):
         return val
 
-    try:
-        if 'TimelineId' in val:
-            return "{}".format(val['TimelineId'])
-        elif 'BigInt' in val:
-            return "{}".format(val['BigInt'])
-        elif 'Timestamp' in val:
-            return "{}".format(val['Timestamp'])
-        elif 'EventCoordinate' in val:
-            ec = val['EventCoordinate']
-            out_str = "{}:".format(UUID(ec['timeline_id']).hex)
-            id_bytes = ec['id']
-            # Skip the leading zeros
-            cursor = len(id_bytes)
-            for i, b in enumerate(id_bytes):
-                if b != 0:
-                    cursor = i
-                    break
-            if cursor == len(id_bytes):
-                out_str += "0"
-            else:
-                for b in id_bytes[cursor:]:
-                    out_str += "{:02x}".format(b)
-            return out_str
-        else:
-            return "{}".format(val)
-    except TypeError:
-        return "{}".format(val)
+    # Only the tagged forms are objects; everything else (numbers, bools) formats directly
+    if not isinstance(val, dict):
+        return str(val)
+
+    tag = next(iter(val), None)
+    formatter = _TAGGED_ATTR_VAL_FORMATTERS.get(tag)
+    if formatter:
+        try:
+            return formatter(val[tag])
+        except TypeError:
+            pass
+    return str(val)
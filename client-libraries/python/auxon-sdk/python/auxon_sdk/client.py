@@ -1,15 +1,379 @@
-from urllib.parse import urlparse, urlencode
+from urllib.parse import quote_plus, urljoin, urlsplit
+from urllib.error import HTTPError
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
-import appdirs
+from functools import lru_cache
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+import gzip
+import io
+import itertools
 import os
 import os.path
-from urllib.request import urlopen, Request
-import json
+import queue
+import shutil
+import socket
+import tempfile
+import warnings
+from urllib.request import build_opener, getproxies, proxy_bypass, urlopen, HTTPRedirectHandler, Request
+
+from ._json import dumps, loads
+
+
+# Characters that quote_plus never escapes
+_ALWAYS_SAFE_BYTES = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~"
+
+
+def _fast_quote(value):
+    r"""Quote a query value like urlencode does (quote_plus, after converting non-string values
+    with str), but return values that need no escaping, which is most of them, as they are."""
+    if not isinstance(value, (str, bytes)):
+        value = str(value)
+    if (isinstance(value, str) and value.isascii()
+            and not value.encode('ascii').translate(None, _ALWAYS_SAFE_BYTES)):
+        return value
+    return quote_plus(value)
+
+
+@lru_cache(maxsize=None)
+def _pandas():
+    r"""Import pandas on first use, so that importing this module doesn't pay for it."""
+    import pandas
+    return pandas
+
+
+@lru_cache(maxsize=None)
+def _pyarrow():
+    r"""Import pyarrow and its JSON reader on first use, or return None if pyarrow isn't
+    installed. The outcome is cached so a missing pyarrow isn't searched for on every call."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.json
+    except ImportError:
+        return None
+    return pyarrow
+
+
+# Columns holding timestamps, and the dtype they're loaded as
+_TIMESTAMP_DTYPES = {'event.timestamp': 'datetime64[ns]',
+                     'segment.latest_receive_time': 'datetime64[ns]'}
+
+
+def _is_default_date_column(name):
+    r"""Whether pd.read_json converts this column to dates by default (keep_default_dates)."""
+    name = name.lower()
+    return (name.endswith(("_at", "_time")) or name in {"modified", "date", "datetime"}
+            or name.startswith("timestamp"))
+
+
+# pd.read_json leaves date-like columns as numbers if any value is within a year of the epoch,
+# in seconds
+_MIN_EPOCH_S = 31_536_000
+
+
+def _convert_json_dates(column):
+    r"""Convert a date-like column to datetimes the way pd.read_json does by default: strings are
+    parsed as dates, and numbers are read as epoch seconds, milliseconds, microseconds or
+    nanoseconds, whichever is the first to fit. The column is returned as it is if it can't be
+    converted."""
+    pd = _pandas()
+    if not len(column):
+        return column
+
+    data = column
+    if data.dtype == "object" or data.dtype == "string":
+        try:
+            data = data.astype("int64")
+        except OverflowError:
+            return column
+        except (TypeError, ValueError):
+            pass
+
+    if data.dtype.kind in "iuf" and not (data.isna() | (data > _MIN_EPOCH_S)).all():
+        return column
+
+    if data.dtype == "string":
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning)
+            for date_format in (None, "iso8601", "mixed"):
+                try:
+                    return pd.to_datetime(data, errors="raise", format=date_format)
+                except (ValueError, OverflowError, TypeError):
+                    continue
+        return column
+
+    for unit in ("s", "ms", "us", "ns"):
+        try:
+            converted = pd.to_datetime(data, errors="raise", unit=unit)
+            converted.dt.as_unit("ns")
+        except (ValueError, OverflowError, TypeError):
+            continue
+        return converted
+    return column
+
+
+def _convert_json_dtypes(df, dtype_dict):
+    r"""Convert a dataframe's columns in place as pd.read_json(dtype=dtype_dict) does: date-like
+    columns are converted to dates, taking precedence over dtype_dict, and the other columns
+    named in dtype_dict are cast, if they can be."""
+    for name in df.columns:
+        if _is_default_date_column(name):
+            df[name] = _convert_json_dates(df[name])
+        elif name in dtype_dict:
+            try:
+                df[name] = df[name].astype(dtype_dict[name])
+            except (TypeError, ValueError):
+                pass
+    return df
+
+
+# Flag parameters are only ever sent as 'true', so their query fragments are built up front
+_FLAG_QUERY_FRAGMENTS = {name: (name + "=true",)
+                         for name in ('only_newest_segment_in_workspace', 'split_by_segment', 'include_timeline_attrs')}
+
+
+def _single_query_fragment(name, value):
+    return (name + "=" + _fast_quote(value),)
+
+
+def _filter_query_fragment(name, value):
+    # Filter expressions almost always contain characters that need escaping ('=', quotes,
+    # spaces), so they skip _fast_quote's no-escaping check
+    if not isinstance(value, (str, bytes)):
+        value = str(value)
+    return (name + "=" + quote_plus(value),)
+
+
+def _flag_query_fragment(name, value):
+    return _FLAG_QUERY_FRAGMENTS[name]
+
+
+def _repeated_query_fragments(name, values):
+    prefix = name + "="
+    return [prefix + _fast_quote(value) for value in values]
+
+
+# Query parameters accepted by the dataframe endpoints, along with how an argument value maps to
+# the parameter's "key=value" query fragments. Keys are used as they are, since none of them need
+# escaping.
+_SCOPE_URL_PARAMS = {
+    'workspace_name': _single_query_fragment,
+    'workspace_version_id': _single_query_fragment,
+    'segments': _repeated_query_fragments,
+    'only_newest_segment_in_workspace': _flag_query_fragment,
+    'timeline_filter': _filter_query_fragment,
+}
+
+_EVENTS_DATA_FRAME_URL_PARAMS = {
+    **_SCOPE_URL_PARAMS,
+    'split_by_segment': _flag_query_fragment,
+    'event_filter': _filter_query_fragment,
+    'include_timeline_attrs': _flag_query_fragment,
+    'include_attrs': _repeated_query_fragments,
+}
+
+_EVENT_VALUE_DISTRIBUTIONS_DATA_FRAME_URL_PARAMS = {
+    **_SCOPE_URL_PARAMS,
+    'group_keys': _repeated_query_fragments,
+    'event_filter': _filter_query_fragment,
+    'include_attrs': _repeated_query_fragments,
+}
+
+
+def _query_string(param_specs, kwargs):
+    r"""Build the query string for the truthy arguments in kwargs, in argument order. Only the
+    arguments actually passed are looked up in param_specs."""
+    if not kwargs.keys() <= param_specs.keys():
+        unexpected = next(iter(kwargs.keys() - param_specs.keys()))
+        raise TypeError("unexpected keyword argument '{}'".format(unexpected))
+
+    return "&".join([fragment
+                     for name, arg in kwargs.items() if arg
+                     for fragment in param_specs[name](name, arg)])
+
+
+# Query parameters for each inspection endpoint
+_INSPECTION_URL_PARAMS = {
+    "events_data_frame": _EVENTS_DATA_FRAME_URL_PARAMS,
+    "event_value_distributions_data_frame": _EVENT_VALUE_DISTRIBUTIONS_DATA_FRAME_URL_PARAMS,
+}
+
+
+def _frozen_kwargs(kwargs):
+    r"""A hashable form of kwargs, as (name, type, value) triples with the items of list and tuple
+    arguments frozen as (type, item) pairs. The types keep apart arguments that are equal but are
+    quoted differently, like 1, 1.0 and True."""
+    return tuple((name, type(arg),
+                  tuple((type(item), item) for item in arg) if isinstance(arg, (list, tuple)) else arg)
+                 for name, arg in kwargs.items())
+
+
+def _thawed_kwargs(frozen_kwargs):
+    r"""The kwargs a _frozen_kwargs result was made from."""
+    return {name: arg_type(item for _, item in arg) if issubclass(arg_type, (list, tuple)) else arg
+            for name, arg_type, arg in frozen_kwargs}
+
+
+@lru_cache(maxsize=256)
+def _cached_query_string(endpoint, frozen_kwargs):
+    r"""_query_string for an inspection endpoint, memoized since dataframe queries tend to be
+    issued repeatedly with the same arguments."""
+    return _query_string(_INSPECTION_URL_PARAMS[endpoint], _thawed_kwargs(frozen_kwargs))
+
+
+def _inspection_query_string(endpoint, kwargs):
+    try:
+        return _cached_query_string(endpoint, _frozen_kwargs(kwargs))
+    except TypeError:
+        # Unhashable arguments can't be memoized (and unknown arguments are rejected here too)
+        return _query_string(_INSPECTION_URL_PARAMS[endpoint], kwargs)
+
+
+def _build_scope(workspace_name=None, workspace_version_id=None, segments=None,
+                 only_newest_segment_in_workspace=None, timeline_filter=None):
+    r"""Build the scope object of an RPC request body from the scope arguments shared by the
+    Modality methods. A workspace version id takes precedence over a workspace name."""
+    if segments:
+        return {'WorkspaceSegments': {"timeline_filter": timeline_filter, "segments": segments}}
+
+    if workspace_version_id:
+        workspace = {"Version": workspace_version_id}
+    elif workspace_name:
+        workspace = {"Name": workspace_name}
+    elif only_newest_segment_in_workspace:
+        raise ValueError('Either workspace_version_id or workspace_name is required if only_newest_segment_in_workspace is True')
+    else:
+        return {'Global': {"timeline_filter": timeline_filter}}
+
+    if only_newest_segment_in_workspace:
+        return {'NewestSegmentInWorkspace': {"timeline_filter": timeline_filter, "workspace": workspace}}
+    return {'Workspace': {"timeline_filter": timeline_filter, "workspace": workspace}}
+
+
+class _ConnectionPool:
+    r"""A thread-safe pool of keep-alive HTTP(S) connections to a single Modality server, so
+    consecutive requests don't each pay for a new TCP (and TLS) handshake.
+
+    Requests that need a proxy (per the *_proxy environment variables, as urlopen reads them) go
+    through urllib instead, as do the requests redirects lead to, so they behave as they did with
+    urlopen.
+    """
+
+    def __init__(self, url, maxsize=8, timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
+        parts = urlsplit(url)
+        self._connection_class = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+        self._host = parts.hostname
+        self._port = parts.port
+        self._timeout = timeout
+        self._idle = queue.LifoQueue(maxsize)
+        self._opener = build_opener()
+        self._proxied = parts.scheme in getproxies() and not proxy_bypass(parts.netloc)
+
+    def request(self, method, url, body=None, headers=None):
+        r"""Issue a request and return the response body, raising HTTPError for error statuses
+        the same way urlopen does."""
+        if headers is None:
+            headers = {}
+        if self._proxied:
+            return self._open(Request(url, body, headers, method=method))
+
+        parts = urlsplit(url)
+        path = parts.path
+        if parts.query:
+            path += "?" + parts.query
+
+        try:
+            conn = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            conn = self._new_connection()
+            reused = False
+
+        try:
+            response, data = self._send(conn, method, path, body, headers)
+        except (HTTPException, ConnectionError):
+            conn.close()
+            if not reused:
+                raise
+            # The server may have closed the idle connection; retry once on a fresh one
+            conn = self._new_connection()
+            try:
+                response, data = self._send(conn, method, path, body, headers)
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+        if response.status in (301, 302, 303, 307, 308) and 'Location' in response.headers:
+            # Follow the redirect by urllib's rules: e.g. a POST answered with 303 becomes a GET,
+            # and one answered with 307 raises HTTPError
+            redirect = HTTPRedirectHandler().redirect_request(
+                Request(url, body, headers, method=method), io.BytesIO(data), response.status,
+                response.reason, response.headers, urljoin(url, response.headers['Location']))
+            return self._open(redirect)
+        if response.status >= 300:
+            raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(data))
+        return data
+
+    def close(self):
+        r"""Close the idle connections."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+
+    def _new_connection(self):
+        return self._connection_class(self._host, self._port, timeout=self._timeout)
+
+    def _open(self, request):
+        with self._opener.open(request, timeout=self._timeout) as response:
+            return response.read()
+
+    @staticmethod
+    def _send(conn, method, path, body, headers):
+        conn.request(method, path, body, headers)
+        response = conn.getresponse()
+        return response, response.read()
+
+
+class _ReadOnlyDict(dict):
+    r"""A dict that can't be modified in place. Unlike a MappingProxyType, it can still be copied,
+    pickled and serialized as JSON like any dict; copies are plain, mutable dicts."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("'{}' object is read-only".format(type(self).__name__))
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {key: deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
 
 
 class Modality:
     modality_url = "http://localhost:14181/v1"
     auth_token = None
+    # Seconds to wait on the server before a request fails; None leaves it to the socket default
+    timeout = None
     default_attrs = {
         "TIMELINE": {
             "ID": "timeline.id",
@@ -78,39 +442,83 @@ class Modality:
             "LATEST_RECEIVE_TIME": "segment.latest_receive_time",
         },
     }
-    default_attr_keys = list(default_attrs["TIMELINE"].values()) + \
-                        list(default_attrs["EVENT"].values()) + \
-                        list(default_attrs["MUTATOR"].values()) + \
-                        list(default_attrs["SEGMENT"].values())
+    # Shared by every instance, so it's made read-only
+    default_attrs = _ReadOnlyDict({category: _ReadOnlyDict(attrs) for category, attrs in default_attrs.items()})
+    default_attr_keys = list(itertools.chain.from_iterable(attrs.values() for attrs in default_attrs.values()))
+    # For constant-time membership tests
+    default_attr_key_set = frozenset(default_attr_keys)
 
-    def __init__(self, modality_url=None, auth_token=None):
+    def __init__(self, modality_url=None, auth_token=None, timeout=None):
         # TODO read from cli config file if present
         if modality_url:
             self.modality_url = modality_url
         self.auth_token = auth_token
+        if timeout is not None:
+            self.timeout = timeout
 
         if not self.modality_url:
+            import appdirs
+            import toml
             modality_toml = appdirs.user_config_dir("modality.toml")
             if os.path.exists(modality_toml):
                 modality_toml_dict = toml.load(modality_toml)
                 if modality_toml_dict['modalityd']:
                     self.modality_url = modality_toml_dict['modalityd']
 
-        if not self.auth_token:
-            cli_config_dir = appdirs.user_config_dir("modality_cli")
-            token_file = os.path.join(cli_config_dir, ".user_auth_token")
+        # workspace name -> workspace version id
+        self._ws_version_cache = {}
 
+        if not self.auth_token:
             # Prefer env-var over user-global config file
             if "MODALITY_AUTH_TOKEN" in os.environ:
                 self.auth_token = os.environ.get('MODALITY_AUTH_TOKEN').rstrip()
-            elif os.path.exists(token_file):
-                with open(token_file, 'r') as file:
-                    self.auth_token = file.read().rstrip()
+            else:
+                import appdirs
+                cli_config_dir = appdirs.user_config_dir("modality_cli")
+                token_file = os.path.join(cli_config_dir, ".user_auth_token")
+                if os.path.exists(token_file):
+                    with open(token_file, 'r') as file:
+                        self.auth_token = file.read().rstrip()
+
+        self._init_connection_state()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # Once constructed, rebuild the state derived from the connection settings when they change
+        if name in ('modality_url', 'auth_token', 'timeout') and '_base_headers' in self.__dict__:
+            if name == 'modality_url':
+                # Workspace versions are specific to the server
+                self._ws_version_cache.clear()
+            self._init_connection_state()
+
+    def _init_connection_state(self):
+        r"""Build the endpoint URLs, connection pool and request headers from modality_url,
+        auth_token and timeout, once rather than per request."""
+        if not self.modality_url:
+            raise ValueError("modality_url must be provided, or set as 'modalityd' in modality.toml")
+        self._base_url = self.modality_url
+        if not self._base_url.endswith("/"):
+            self._base_url += "/"
+        # inspection endpoint -> (endpoint URL, endpoint URL with the "?" for a query string)
+        self._inspection_urls = {}
+        for endpoint in _INSPECTION_URL_PARAMS:
+            url = self._base_url + "inspection/" + endpoint
+            self._inspection_urls[endpoint] = (url, url + "?")
+        if '_http' in self.__dict__:
+            self._http.close()
+        self._timeout = socket._GLOBAL_DEFAULT_TIMEOUT if self.timeout is None else self.timeout
+        self._http = _ConnectionPool(self.modality_url, timeout=self._timeout)
+
+        self._auth_headers = {}
+        if self.auth_token:
+            self._auth_headers['X-Auxon-Auth-Token'] = self.auth_token
+        self._base_headers = {"Content-Type": "application/json", **self._auth_headers}
 
     def events_data_frame(self,
                           workspace_name=None, workspace_version_id=None, segments=None,
                           only_newest_segment_in_workspace=None, timeline_filter=None,
-                          split_by_segment=None, event_filter=None, include_timeline_attrs=None, include_attrs=None):
+                          split_by_segment=None, event_filter=None, include_timeline_attrs=None, include_attrs=None,
+                          chunksize=50_000):
         r"""Load events from Modality into a pandas dataframe.
 
         :param str workspace_name: Limit fetched events to those contained in this workspace.
@@ -122,6 +530,11 @@ class Modality:
         :param event_filter: Limit to events passing this Modality filter expression. e.g. "_.name = 'foo'".
         :param bool include_timeline_attrs: Include "timeline.*" columns in the dataframe.
         :param array[str] include_attrs: Include these specific attrs on each event.
+        :param int chunksize: Number of rows to parse at a time when reading without pyarrow. This bounds the memory
+                              used by the JSON parser, but not overall: the chunks are concatenated at the end, so
+                              peak memory is about twice the size of the final dataframe. Use iter_events_data_frame
+                              to process the chunks without holding them all. Column dtypes are inferred per chunk,
+                              so a column can come out wider (e.g. object) than in a single pass.
         """
 
         url = self._events_data_frame_url(workspace_name=workspace_name, workspace_version_id=workspace_version_id,
@@ -131,21 +544,37 @@ class Modality:
                                           split_by_segment=split_by_segment, event_filter=event_filter,
                                           include_timeline_attrs=include_timeline_attrs, include_attrs=include_attrs)
 
-        import pandas as pd
-        dtype_dict = {'event.timestamp': 'datetime64[ns]',
-                      'segment.latest_receive_time': 'datetime64[ns]'}
+        return self._read_json_lines(url, self._auth_headers, _TIMESTAMP_DTYPES, chunksize)
 
-        storage_options = {}
-        if self.auth_token:
-            storage_options['X-Auxon-Auth-Token'] = self.auth_token
+    def iter_events_data_frame(self,
+                               workspace_name=None, workspace_version_id=None, segments=None,
+                               only_newest_segment_in_workspace=None, timeline_filter=None,
+                               split_by_segment=None, event_filter=None, include_timeline_attrs=None, include_attrs=None,
+                               chunksize=50_000):
+        r"""Load events from Modality as a stream of pandas dataframes of up to chunksize rows each.
+
+        This is for event sets too large to hold in memory at once: each chunk is parsed as the
+        response streams in, so it should be aggregated or written out as it arrives rather than
+        collected. Column dtypes are inferred for each chunk on its own, so they can differ between
+        chunks (e.g. a column with no values in one chunk). Takes the same parameters as
+        events_data_frame.
+        """
+        url = self._events_data_frame_url(workspace_name=workspace_name, workspace_version_id=workspace_version_id,
+                                          segments=segments,
+                                          only_newest_segment_in_workspace=only_newest_segment_in_workspace,
+                                          timeline_filter=timeline_filter,
+                                          split_by_segment=split_by_segment, event_filter=event_filter,
+                                          include_timeline_attrs=include_timeline_attrs, include_attrs=include_attrs)
 
-        df = pd.read_json(url, lines=True, dtype=dtype_dict, storage_options=storage_options)
-        return df
+        with self._open_json_lines(url, self._auth_headers) as response:
+            for chunk in self._iter_json_lines_in_chunks(response, chunksize):
+                yield _convert_json_dtypes(chunk, _TIMESTAMP_DTYPES)
 
     def event_value_distributions_data_frame(self,
                                              workspace_name=None, workspace_version_id=None, segments=None,
                                              only_newest_segment_in_workspace=None, timeline_filter=None,
-                                             group_keys=None, event_filter=None, include_attrs=None):
+                                             group_keys=None, event_filter=None, include_attrs=None,
+                                             chunksize=50_000):
         r"""Load statistical sketch of attribute values from Modality into a pandas dataframe.
 
         :param str workspace_name: Limit fetched events to those contained in this workspace.
@@ -157,6 +586,10 @@ class Modality:
                                       Always groups by attr key as well. Order doesn't matter.
         :param event_filter: Limit to events passing this Modality filter expression. e.g. "_.name = 'foo'".
         :param array[str] include_attrs: Include these specific attrs on each event.
+        :param int chunksize: Number of rows to parse at a time. This bounds the memory used by the JSON parser, but
+                              the chunks are concatenated at the end, so peak memory is about twice the size of the
+                              final dataframe. Column dtypes are inferred per chunk, so a column can come out wider
+                              (e.g. object) than in a single pass.
         """
 
         url = self._event_value_distributions_data_frame_url(workspace_name=workspace_name,
@@ -167,16 +600,10 @@ class Modality:
                                                              group_keys=group_keys, event_filter=event_filter,
                                                              include_attrs=include_attrs)
 
-        import pandas as pd
-        dtype_dict = {'event.timestamp': 'datetime64[ns]',
-                      'segment.latest_receive_time': 'datetime64[ns]'}
-
-        storage_options = {}
-        if self.auth_token:
-            storage_options['X-Auxon-Auth-Token'] = self.auth_token
-
-        df = pd.read_json(url, lines=True, dtype=dtype_dict, storage_options=storage_options)
-        return df
+        # Always read with pandas: sketch rows hold nested values, which the pyarrow reader would
+        # only hand back to pandas after spooling the whole response
+        with self._open_json_lines(url, self._auth_headers) as response:
+            return self._read_json_lines_in_chunks(response, _TIMESTAMP_DTYPES, chunksize)
 
     def experiment_overview(self, experiment_name,
                             workspace_name=None, workspace_version_id=None, segments=None,
@@ -191,179 +618,194 @@ class Modality:
         :param timeline_filter: Limit to events logged on timelines which match this Modality filter expression. e.g. "_.name = 'bar'".
         :return:
         """
-        u = self._modality_url("experiment/get_experiment", [])
-        custom_headers = {
-            "Content-Type": "application/json"
-        }
-        if self.auth_token:
-            custom_headers["X-Auxon-Auth-Token"] = self.auth_token
-
-        req_body = {'name': experiment_name, 'scope': {}}
-        if segments:
-            req_body['scope']['WorkspaceSegments'] = {"timeline_filter": timeline_filter, "segments": segments}
-        elif only_newest_segment_in_workspace:
-            if workspace_version_id:
-                req_body['scope']['NewestSegmentInWorkspace'] = {"timeline_filter": timeline_filter,
-                                                  "workspace": {"Version": workspace_version_id}}
-            elif workspace_name:
-                req_body['scope']['NewestSegmentInWorkspace'] = {"timeline_filter": timeline_filter, "workspace": {"Name": workspace_name}}
-            else:
-                raise ValueError('Either workspace_version_id or workspace_name is required if only_newest_segment_in_workspace is True')
-        elif workspace_version_id:
-            req_body['scope']['Workspace'] = {"timeline_filter": timeline_filter,
-                                              "workspace": {"Version": workspace_version_id}}
-        elif workspace_name:
-            req_body['scope']['Workspace'] = {"timeline_filter": timeline_filter, "workspace": {"Name": workspace_name}}
-        else:
-            req_body['scope']['Global'] = {"timeline_filter": timeline_filter}
-        req = Request(
-            u,
-            json.dumps(req_body).encode('ascii'),
-            custom_headers,
-            method='POST'
-        )
-        with urlopen(req) as response:
-            json_response = json.load(response)
-            return json_response
+        scope = _build_scope(workspace_name=workspace_name, workspace_version_id=workspace_version_id,
+                             segments=segments, only_newest_segment_in_workspace=only_newest_segment_in_workspace,
+                             timeline_filter=timeline_filter)
+        return self._post_json("experiment/get_experiment", {'name': experiment_name, 'scope': scope})
+
+    def experiment_overviews(self, experiment_names,
+                             workspace_name=None, workspace_version_id=None, segments=None,
+                             only_newest_segment_in_workspace=None, timeline_filter=None,
+                             max_workers=8):
+        r"""Fetch the overviews of several experiments concurrently, over the same scope.
+
+        :param array[str] experiment_names: The experiments to fetch.
+        :param int max_workers: The maximum number of requests in flight at once.
+
+        The remaining parameters are as for experiment_overview. Returns the overviews in the
+        same order as experiment_names.
+        """
+        scope = _build_scope(workspace_name=workspace_name, workspace_version_id=workspace_version_id,
+                             segments=segments, only_newest_segment_in_workspace=only_newest_segment_in_workspace,
+                             timeline_filter=timeline_filter)
 
-        return None
+        def overview(experiment_name):
+            return self._post_json("experiment/get_experiment", {'name': experiment_name, 'scope': scope})
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(overview, experiment_names))
 
     def workspace_segments(self, workspace_name=None, workspace_version_id=None):
         r"""Retrieve the workspace segments for the given workspace"""
         # Make sure we have the workspace version id
         workspace_version_id = self._resolve_workspace_version_id(workspace_name=workspace_name, workspace_version_id=workspace_version_id)
-        custom_headers = {
-            "Content-Type": "application/json"
-        }
-        if self.auth_token:
-            custom_headers["X-Auxon-Auth-Token"] = self.auth_token
-
-        list_segs_u = self._modality_url("inspection/list_workspace_segments", [])
-        req_body = {"workspace_version_id": workspace_version_id}
-        req = Request(
-            list_segs_u,
-            json.dumps(req_body).encode('ascii'),
-            custom_headers,
-            method='POST'
-        )
-        with urlopen(req) as response:
-            json_resp = json.load(response)
-            if 'Ok' in json_resp:
-                if 'segments' in json_resp['Ok']:
-                    return json_resp['Ok']['segments']
-                else:
-                    return []
+
+        json_resp = self._post_json("inspection/list_workspace_segments",
+                                    {"workspace_version_id": workspace_version_id})
+        if 'Ok' in json_resp:
+            if 'segments' in json_resp['Ok']:
+                return json_resp['Ok']['segments']
+            else:
+                return []
+        else:
+            raise Exception("Unsuccessful attempt at getting workspace segments. {}".format(json_resp['Err']))
+
+    def invalidate_workspace_cache(self):
+        r"""Forget the workspace versions resolved so far, so that workspaces are looked up by name
+        again. Use this in long-lived sessions when workspace definitions may have changed."""
+        self._ws_version_cache.clear()
+
+    def _read_json_lines(self, url, headers, dtype_dict, chunksize):
+        r"""Load an NDJSON response into a pandas dataframe, using pyarrow if it's installed."""
+        if _pyarrow() is None:
+            with self._open_json_lines(url, headers) as response:
+                return self._read_json_lines_in_chunks(response, dtype_dict, chunksize)
+
+        return self._read_json_lines_with_arrow(url, headers, dtype_dict, chunksize)
+
+    @contextmanager
+    def _open_json_lines(self, url, headers):
+        r"""Open a streaming NDJSON response. The response is requested gzip-compressed, since
+        NDJSON compresses very well, and is decompressed as it's read."""
+        headers = {**headers, 'Accept-Encoding': 'gzip'}
+        with urlopen(Request(url, headers=headers), timeout=self._timeout) as response:
+            if response.headers.get('Content-Encoding') == 'gzip':
+                with gzip.GzipFile(fileobj=response) as decompressed:
+                    yield decompressed
             else:
-                raise Exception("Unsuccessful attempt at getting workspace segments. {}".format(json_resp['Err']))
+                yield response
+
+    def _iter_json_lines_in_chunks(self, file, chunksize):
+        r"""Parse NDJSON into pandas dataframes of up to chunksize rows each, as it's read. Dates
+        aren't converted; see _convert_json_dtypes."""
+        pd = _pandas()
+        with pd.read_json(file, lines=True, convert_dates=False, keep_default_dates=False,
+                          chunksize=chunksize) as reader:
+            yield from reader
+
+    def _read_json_lines_in_chunks(self, file, dtype_dict, chunksize):
+        r"""Load NDJSON into a pandas dataframe, parsing it chunksize rows at a time as it's read
+        rather than buffering all of it first.
+
+        All the chunks are kept until they're concatenated, so this bounds the parser's memory use,
+        not the total. Dates and the dtype_dict columns are converted once, after concatenation, so
+        that a column isn't converted in some chunks and not in others (e.g. a date-like column
+        with an implausibly small timestamp in one chunk). Other dtypes are still inferred per
+        chunk, and reconciled by concatenation: e.g. a column that's all null in some chunks and
+        holds strings in others comes out as object, where a single pass could give str.
+        """
+        pd = _pandas()
+
+        chunks = list(self._iter_json_lines_in_chunks(file, chunksize))
+        if not chunks:
+            return pd.DataFrame()
+        return _convert_json_dtypes(pd.concat(chunks, ignore_index=True), dtype_dict)
+
+    def _read_json_lines_with_arrow(self, url, headers, dtype_dict, chunksize):
+        r"""Load an NDJSON response into a pandas dataframe using pyarrow's multithreaded reader.
+
+        The response is spooled to a temporary file (in memory until it gets large) so that it can
+        be read again with pandas if the rows don't share a consistent schema (e.g. an attr whose
+        value type varies between events), if the response is empty, or if Arrow's reading of it
+        would differ from pd.read_json's (see _arrow_differs_from_pandas).
+        """
+        pa = _pyarrow()
+
+        with self._open_json_lines(url, headers) as response, \
+                tempfile.SpooledTemporaryFile(max_size=64 << 20) as body:
+            shutil.copyfileobj(response, body, 1 << 20)
+            body.seek(0)
+            try:
+                read_options = pa.json.ReadOptions(use_threads=True, block_size=8 << 20)
+                table = pa.json.read_json(body, read_options=read_options)
+            except pa.ArrowInvalid:
+                table = None
+            if table is None or self._arrow_differs_from_pandas(table):
+                body.seek(0)
+                return self._read_json_lines_in_chunks(body, dtype_dict, chunksize)
+
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+        return _convert_json_dtypes(df, dtype_dict)
+
+    @staticmethod
+    def _arrow_differs_from_pandas(table):
+        r"""Whether converting a table read by Arrow to pandas would give a different dataframe
+        than pd.read_json gives for the same NDJSON:
+
+        - Nested columns: Arrow merges differently tagged attr values (e.g. BigInt and TimelineId)
+          into a single struct type, and turns lists into arrays, while pandas keeps the plain dicts
+          and lists.
+        - Timestamp columns: Arrow infers them from ISO-8601-looking strings in any column, while
+          pandas only parses date-like columns, and at a different resolution.
+        - Null columns (all values null): pandas makes them float64 NaN, Arrow object None.
+        - Boolean columns holding nulls: pandas makes them float64, Arrow object.
+        - Floating-point columns holding magnitudes of 2**63 or more: these may be integers too
+          large for int64 (e.g. u64 attrs), which Arrow reads as doubles, losing precision, while
+          pandas reads them exactly as uint64.
+        """
+        pa = _pyarrow()
+        for column, field in zip(table.columns, table.schema):
+            if (pa.types.is_nested(field.type) or pa.types.is_timestamp(field.type)
+                    or pa.types.is_null(field.type)):
+                return True
+            if pa.types.is_boolean(field.type) and column.null_count:
+                return True
+            if pa.types.is_floating(field.type):
+                largest = pa.compute.max(pa.compute.abs(column)).as_py()
+                if largest is not None and largest >= 2 ** 63:
+                    return True
+        return False
 
     def _resolve_workspace_version_id(self, workspace_name=None, workspace_version_id=None):
         if workspace_version_id:
             return workspace_version_id
 
-        custom_headers = {
-            "Content-Type": "application/json"
-        }
-        if self.auth_token:
-            custom_headers["X-Auxon-Auth-Token"] = self.auth_token
-
         if not workspace_name:
             raise ValueError("Either workspace_version_id or workspace_name must be provided")
 
-        get_ws_u = self._modality_url("workspace/get_workspace_definition", [])
-        req_body = {"workspace_name": workspace_name}
-        req = Request(
-            get_ws_u,
-            json.dumps(req_body).encode('ascii'),
-            custom_headers,
-            method='POST'
-        )
-        with urlopen(req) as response:
-            json_resp = json.load(response)
-            if 'Ok' in json_resp:
-                return json_resp['Ok']['version']
-            else:
-                raise Exception("Unsuccessful attempt at getting workspace. {}".format(json_resp['Err']))
-
-    def _flat_scope_url_params(self, workspace_name=None, workspace_version_id=None, segments=None,
-                               only_newest_segment_in_workspace=None, timeline_filter=None):
-        url_params = []
-
-        # scope
-        if workspace_name:
-            url_params.append(('workspace_name', workspace_name))
-
-        if workspace_version_id:
-            url_params.append(('workspace_version_id', workspace_version_id))
-
-        if segments:
-            for seg in segments:
-                url_params.append(('segments', seg))
-
-        if only_newest_segment_in_workspace:
-            url_params.append(
-                ('only_newest_segment_in_workspace', 'true' if only_newest_segment_in_workspace else 'false'))
+        cached_version_id = self._ws_version_cache.get(workspace_name)
+        if cached_version_id:
+            return cached_version_id
 
-        if timeline_filter:
-            url_params.append(('timeline_filter', timeline_filter))
-
-        return url_params
-
-    def _events_data_frame_url(self,
-                               workspace_name=None, workspace_version_id=None, segments=None,
-                               only_newest_segment_in_workspace=None, timeline_filter=None,
-                               split_by_segment=None, event_filter=None, include_timeline_attrs=None,
-                               include_attrs=None):
-
-        url_params = self._flat_scope_url_params(workspace_name=workspace_name,
-                                                 workspace_version_id=workspace_version_id, segments=segments,
-                                                 only_newest_segment_in_workspace=only_newest_segment_in_workspace,
-                                                 timeline_filter=timeline_filter)
-
-        if split_by_segment:
-            url_params.append(('split_by_segment', 'true' if split_by_segment else 'false'))
-
-        if event_filter:
-            url_params.append(('event_filter', event_filter))
-
-        if include_timeline_attrs:
-            url_params.append(('include_timeline_attrs', 'true' if include_timeline_attrs else 'false'))
-
-        if include_attrs:
-            for attr in include_attrs:
-                url_params.append(('include_attrs', attr))
-
-        return self._modality_url("inspection/events_data_frame", url_params)
-
-    def _event_value_distributions_data_frame_url(
-            self,
-            workspace_name=None, workspace_version_id=None, segments=None, only_newest_segment_in_workspace=None,
-            timeline_filter=None,
-            group_keys=None, event_filter=None, include_attrs=None):
-
-        url_params = self._flat_scope_url_params(workspace_name=workspace_name,
-                                                 workspace_version_id=workspace_version_id, segments=segments,
-                                                 only_newest_segment_in_workspace=only_newest_segment_in_workspace,
-                                                 timeline_filter=timeline_filter)
-
-        if group_keys:
-            for group_key in group_keys:
-                url_params.append(('group_keys', group_key))
-
-        if event_filter:
-            url_params.append(('event_filter', event_filter))
-
-        if include_attrs:
-            for attr in include_attrs:
-                url_params.append(('include_attrs', attr))
-
-        return self._modality_url("inspection/event_value_distributions_data_frame", url_params)
-
-    def _modality_url(self, endpoint, query_params):
-        url = self.modality_url
-        if not url.endswith("/"):
-            url += "/"
-        url += endpoint
-        if query_params:
-            url += "?" + urlencode(query_params)
-
-        return url
+        json_resp = self._post_json("workspace/get_workspace_definition", {"workspace_name": workspace_name})
+        if 'Ok' in json_resp:
+            workspace_version_id = json_resp['Ok']['version']
+            self._ws_version_cache[workspace_name] = workspace_version_id
+            return workspace_version_id
+        else:
+            raise Exception("Unsuccessful attempt at getting workspace. {}".format(json_resp['Err']))
+
+    def _post_json(self, endpoint, req_body):
+        r"""POST a JSON request body to a Modality RPC endpoint over a pooled connection and
+        return the decoded JSON response."""
+        data = self._http.request('POST', self._modality_url(endpoint),
+                                  dumps(req_body), self._base_headers)
+        return loads(data)
+
+    def _events_data_frame_url(self, **kwargs):
+        return self._build_inspection_url("events_data_frame", kwargs)
+
+    def _event_value_distributions_data_frame_url(self, **kwargs):
+        return self._build_inspection_url("event_value_distributions_data_frame", kwargs)
+
+    def _build_inspection_url(self, endpoint, kwargs):
+        url, query_prefix = self._inspection_urls[endpoint]
+        if not kwargs:
+            return url
+        query = _inspection_query_string(endpoint, kwargs)
+        if not query:
+            return url
+        return query_prefix + query
+
+    def _modality_url(self, endpoint):
+        return self._base_url + endpoint
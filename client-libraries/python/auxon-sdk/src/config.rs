@@ -1,5 +1,6 @@
 use auxon_sdk::reflector_config::TomlValue;
-use pyo3::prelude::*;
+use pyo3::{prelude::*, types::PyDict};
+use std::collections::HashMap;
 
 use crate::{ingest::IngestClient, mutator::MutatorHost, SdkError};
 
@@ -9,6 +10,63 @@ pub struct PluginConfig {
     plugin_config: PyObject,
 }
 
+/// The config fields of a dataclass, cached on the class itself so they
+/// are only resolved once per class.
+#[pyclass(frozen)]
+struct ConfigFields {
+    fields: Vec<ConfigField>,
+
+    /// Index into `fields`, keyed by `env_var_name`
+    by_env_var_name: HashMap<String, usize>,
+
+    /// Index into `fields`, keyed by `toml_key`
+    by_toml_key: HashMap<String, usize>,
+}
+
+impl ConfigFields {
+    fn new(fields: Vec<ConfigField>) -> Self {
+        let by_env_var_name = fields
+            .iter()
+            .enumerate()
+            .map(|(idx, f)| (f.env_var_name.clone(), idx))
+            .collect();
+        let by_toml_key = fields
+            .iter()
+            .enumerate()
+            .map(|(idx, f)| (f.toml_key.clone(), idx))
+            .collect();
+        Self {
+            fields,
+            by_env_var_name,
+            by_toml_key,
+        }
+    }
+
+    fn find_by_env_var_name(&self, env_var_name: &str) -> Option<&ConfigField> {
+        self.by_env_var_name
+            .get(env_var_name)
+            .map(|idx| &self.fields[*idx])
+    }
+
+    fn find_by_toml_key(&self, toml_key: &str) -> Option<&ConfigField> {
+        self.by_toml_key.get(toml_key).map(|idx| &self.fields[*idx])
+    }
+
+    /// The `map_env_val` hook for [auxon_sdk::plugin_utils::ingest::Config::load_custom]
+    fn map_env_val(
+        &self,
+        env_key: &str,
+        env_val: &str,
+    ) -> Result<Option<(String, TomlValue)>, Box<dyn std::error::Error + Send + Sync>> {
+        if let Some(field) = self.find_by_env_var_name(env_key) {
+            let parsed_val = field.ty.parse_env(env_val)?;
+            Ok(Some((field.toml_key.clone(), parsed_val)))
+        } else {
+            Ok(None)
+        }
+    }
+}
+
 #[derive(Debug)]
 struct ConfigField {
     /// What's the python attr name for this field?
@@ -24,15 +82,20 @@ struct ConfigField {
 
     /// How do you configure this from toml? The form is `python-name`
     toml_key: String,
+
+    /// Is this field a parameter of the generated `__init__`? Fields
+    /// declared with `field(init=False)` aren't.
+    init: bool,
 }
 
 impl ConfigField {
-    fn new(python_attr_name: String, ty: ConfigFieldType) -> Self {
+    fn new(python_attr_name: String, ty: ConfigFieldType, init: bool) -> Self {
         Self {
             toml_key: python_attr_name.to_lowercase().replace('_', "-"),
             env_var_name: python_attr_name.to_uppercase(),
             python_attr_name,
             ty,
+            init,
         }
     }
 }
@@ -54,11 +117,23 @@ impl ConfigFieldType {
             ConfigFieldType::Int => Ok(TomlValue::Integer(env_val.parse()?)),
             ConfigFieldType::Float => Ok(TomlValue::Float(env_val.parse()?)),
             ConfigFieldType::Str => Ok(TomlValue::String(env_val.to_owned())),
-            ConfigFieldType::Bool => Ok(TomlValue::Boolean(env_val.to_lowercase().parse()?)),
+            ConfigFieldType::Bool => Ok(TomlValue::Boolean(parse_bool_ignore_case(env_val)?)),
         }
     }
 }
 
+/// Parse "true" or "false" in any case, without allocating a lowercased copy
+fn parse_bool_ignore_case(s: &str) -> Result<bool, std::str::ParseBoolError> {
+    if s.eq_ignore_ascii_case("true") {
+        Ok(true)
+    } else if s.eq_ignore_ascii_case("false") {
+        Ok(false)
+    } else {
+        // not a bool in any case; let the std parser produce the error
+        s.parse()
+    }
+}
+
 impl TryFrom<&str> for ConfigFieldType {
     type Error = PyErr;
 
@@ -78,54 +153,45 @@ impl TryFrom<&str> for ConfigFieldType {
 #[pymethods]
 impl PluginConfig {
     #[new]
-    pub fn new(config_dataclass: &Bound<PyAny>, env_prefix: &str) -> Result<Self, PyErr> {
-        let config_fields_name_and_type = Python::with_gil(|py| {
-            let dataclasses = PyModule::import_bound(py, "dataclasses")?;
-            let dataclass_fields: Vec<Bound<PyAny>> = dataclasses
-                .getattr("fields")?
-                .call1((config_dataclass,))?
-                .extract()?;
-            let mut field_vec = vec![];
-            for field in dataclass_fields {
-                let name: String = field.getattr("name")?.extract()?;
-                let ty: String = field.getattr("type")?.getattr("__name__")?.extract()?;
-                field_vec.push((name, ty));
-            }
-
-            Result::<_, PyErr>::Ok(field_vec)
-        })?;
-
-        let config_fields: Vec<ConfigField> = config_fields_name_and_type
-            .into_iter()
-            .map(|(name, ty)| Ok(ConfigField::new(name, ty.as_str().try_into()?)))
-            .collect::<Result<_, PyErr>>()?;
+    pub fn new(
+        config_dataclass: &Bound<PyAny>,
+        env_prefix: &str,
+        config_source: Option<&str>,
+    ) -> Result<Self, PyErr> {
+        let config_fields = cached_config_fields(config_dataclass)?;
+        let config_fields = config_fields.get();
 
-        let config = auxon_sdk::plugin_utils::ingest::Config::<toml::value::Table>::load_custom(
-            env_prefix,
-            |env_key, env_val| {
-                if let Some(field) = config_fields.iter().find(|f| f.env_var_name == env_key) {
-                    let parsed_val = field.ty.parse_env(env_val)?;
-                    Ok(Some((field.toml_key.clone(), parsed_val)))
-                } else {
-                    Ok(None)
-                }
-            },
-        )
+        // config_source, if given, takes the place of the MODALITY_REFLECTOR_CONFIG file
+        type Config = auxon_sdk::plugin_utils::ingest::Config<toml::value::Table>;
+        let config = match config_source {
+            Some(src) => Config::load_custom_from_str(env_prefix, src, |k, v| {
+                config_fields.map_env_val(k, v)
+            }),
+            None => Config::load_custom(env_prefix, |k, v| config_fields.map_env_val(k, v)),
+        }
         .map_err(SdkError::from)?;
 
-        // build an instance of config_dataclass from the toml table in config.plugin
-        let plugin_config = config_dataclass.call0()?; // dataclass constructor
-        Python::with_gil(|py| {
-            for (toml_key, toml_value) in config.plugin.iter() {
-                if let Some(field) = config_fields.iter().find(|f| &f.toml_key == toml_key) {
-                    plugin_config.setattr(
-                        field.python_attr_name.as_str(),
-                        toml_value_to_py(py, toml_value)?,
-                    )?;
+        // build an instance of config_dataclass from the toml table in
+        // config.plugin, passing the values straight to the dataclass
+        // constructor rather than assigning them one by one afterwards
+        let py = config_dataclass.py();
+        let init_kwargs = PyDict::new_bound(py);
+        let mut non_init_attrs = vec![];
+        for (toml_key, toml_value) in config.plugin.iter() {
+            if let Some(field) = config_fields.find_by_toml_key(toml_key) {
+                let value = toml_value_to_py(py, toml_value)?;
+                if field.init {
+                    init_kwargs.set_item(field.python_attr_name.as_str(), value)?;
+                } else {
+                    non_init_attrs.push((field.python_attr_name.as_str(), value));
                 }
             }
-            Result::<(), PyErr>::Ok(())
-        })?;
+        }
+
+        let plugin_config = config_dataclass.call((), Some(&init_kwargs))?; // dataclass constructor
+        for (attr_name, value) in non_init_attrs {
+            plugin_config.setattr(attr_name, value)?;
+        }
 
         Ok(Self {
             config,
@@ -158,6 +224,41 @@ impl PluginConfig {
     }
 }
 
+/// The class attribute used to cache a dataclass's [ConfigFields].
+const FIELD_CACHE_ATTR: &str = "__auxon_config_fields__";
+
+fn cached_config_fields<'py>(
+    config_dataclass: &Bound<'py, PyAny>,
+) -> PyResult<Bound<'py, ConfigFields>> {
+    let py = config_dataclass.py();
+
+    // Only look at the class's own __dict__; a subclass must not pick up
+    // the fields cached on its base class.
+    let cached = config_dataclass
+        .getattr("__dict__")?
+        .call_method1("get", (FIELD_CACHE_ATTR,))?;
+    if !cached.is_none() {
+        return Ok(cached.downcast_into::<ConfigFields>()?);
+    }
+
+    let dataclasses = PyModule::import_bound(py, "dataclasses")?;
+    let dataclass_fields: Vec<Bound<PyAny>> = dataclasses
+        .getattr("fields")?
+        .call1((config_dataclass,))?
+        .extract()?;
+    let mut field_vec = vec![];
+    for field in dataclass_fields {
+        let name: String = field.getattr("name")?.extract()?;
+        let ty: String = field.getattr("type")?.getattr("__name__")?.extract()?;
+        let init: bool = field.getattr("init")?.extract()?;
+        field_vec.push(ConfigField::new(name, ty.as_str().try_into()?, init));
+    }
+
+    let config_fields = Bound::new(py, ConfigFields::new(field_vec))?;
+    config_dataclass.setattr(FIELD_CACHE_ATTR, &config_fields)?;
+    Ok(config_fields)
+}
+
 fn toml_value_to_py(py: Python, v: &TomlValue) -> PyResult<PyObject> {
     match v {
         TomlValue::String(s) => Ok(s.to_object(py)),
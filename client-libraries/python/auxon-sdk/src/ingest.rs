@@ -11,6 +11,14 @@ pub struct IngestClient {
     client: auxon_sdk::plugin_utils::ingest::Client,
 }
 
+/// A fixed list of event attr keys, prepared once with
+/// `IngestClient.prepare_event_schema` and reused for every event sent
+/// with `IngestClient.send_event_with_schema`.
+#[pyclass]
+pub struct EventSchema {
+    keys: Vec<String>,
+}
+
 impl IngestClient {
     pub fn new(
         rt: tokio::runtime::Runtime,
@@ -35,10 +43,10 @@ impl IngestClient {
         name: &str,
         timeline_attrs: &Bound<pyo3::types::PyDict>,
     ) -> Result<(), PyErr> {
-        let attrs = py_dict_to_attr_vec(timeline_attrs)?;
+        let (keys, vals) = py_dict_to_attrs(timeline_attrs)?;
         self.rt.block_on(
             self.client
-                .send_timeline_attrs(name, attrs.iter().map(|(k, v)| (k.as_str(), v.clone()))),
+                .send_timeline_attrs(name, keys.iter().map(String::as_str).zip(vals)),
         )?;
 
         Ok(())
@@ -50,12 +58,47 @@ impl IngestClient {
         ordering: u128,
         event_attrs: &Bound<pyo3::types::PyDict>,
     ) -> Result<(), PyErr> {
-        let attrs = py_dict_to_attr_vec(event_attrs)?;
+        let (keys, vals) = py_dict_to_attrs(event_attrs)?;
+
+        self.rt.block_on(self.client.send_event(
+            name,
+            ordering,
+            keys.iter().map(String::as_str).zip(vals),
+        ))?;
+
+        Ok(())
+    }
+
+    pub fn prepare_event_schema(&self, keys: Vec<String>) -> EventSchema {
+        EventSchema { keys }
+    }
+
+    /// Like `send_event`, but the attr keys come from `schema` and
+    /// `values` is a sequence of the corresponding attr values, in the
+    /// same order. This avoids building and walking a dict per event.
+    pub fn send_event_with_schema(
+        &mut self,
+        name: &str,
+        ordering: u128,
+        schema: PyRef<EventSchema>,
+        values: &Bound<PyAny>,
+    ) -> Result<(), PyErr> {
+        let vals = values
+            .iter()?
+            .map(|v| types::py_any_to_attr_val(v?))
+            .collect::<Result<Vec<_>, PyErr>>()?;
+        if vals.len() != schema.keys.len() {
+            return Err(pyo3::exceptions::PyValueError::new_err(format!(
+                "Expected {} attr values for the event schema, got {}",
+                schema.keys.len(),
+                vals.len()
+            )));
+        }
 
         self.rt.block_on(self.client.send_event(
             name,
             ordering,
-            attrs.iter().map(|(k, v)| (k.as_str(), v.clone())),
+            schema.keys.iter().map(String::as_str).zip(vals),
         ))?;
 
         Ok(())
@@ -72,12 +115,16 @@ impl IngestClient {
     }
 }
 
-fn py_dict_to_attr_vec(dict: &Bound<pyo3::types::PyDict>) -> Result<Vec<(String, AttrVal)>, PyErr> {
-    let mut attrs = Vec::with_capacity(dict.len());
+/// Convert a python dict into parallel key and value vectors, so the
+/// values can be moved into the client while the keys are borrowed.
+fn py_dict_to_attrs(
+    dict: &Bound<pyo3::types::PyDict>,
+) -> Result<(Vec<String>, Vec<AttrVal>), PyErr> {
+    let mut keys = Vec::with_capacity(dict.len());
+    let mut vals = Vec::with_capacity(dict.len());
     for (k, v) in dict.iter() {
-        let k = k.extract::<String>()?;
-        let v = types::py_any_to_attr_val(v)?;
-        attrs.push((k, v));
+        keys.push(k.extract::<String>()?);
+        vals.push(types::py_any_to_attr_val(v)?);
     }
-    Ok(attrs)
+    Ok((keys, vals))
 }
@@ -15,6 +15,7 @@ fn _auxon_sdk(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<auxon_sdk::mutation_plane::types::MutatorId>()?;
     m.add_class::<config::PluginConfig>()?;
     m.add_class::<ingest::IngestClient>()?;
+    m.add_class::<ingest::EventSchema>()?;
     m.add_class::<mutator::MutatorParam>()?;
     m.add_class::<mutator::MutatorHost>()?;
     m.add_class::<mutator::PyMutatorDescriptor>()?;
@@ -1,4 +1,104 @@
 import auxon_sdk.client
+from contextlib import contextmanager
+import copy
+import gzip
+import http.server
+import io
+import json
+import pickle
+import pandas
+import pytest
+import threading
+import time
+
+@contextmanager
+def local_server(handler_class):
+    r"""Serve handler_class on a local port, and yield the server's URL."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:{}".format(server.server_port)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@contextmanager
+def local_modality(handler_class):
+    r"""Serve handler_class on a local port, and yield a Modality client pointed at it."""
+    with local_server(handler_class) as url:
+        yield auxon_sdk.client.Modality(url + "/v1", auth_token="test-token")
+
+def rpc_handler(respond, log, keep_alive=True):
+    r"""A handler that answers each POST with the JSON respond(path, request) returns, and appends
+    (method, path, client port, request) to log. Without keep_alive, each connection is dropped
+    after one response, without telling the client, as a server timing out idle connections does."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            log.append(("POST", self.path, self.client_address[1], request))
+            self.send_json(respond(self.path, request))
+            if not keep_alive:
+                self.close_connection = True
+
+        def send_json(self, response, status=200):
+            body = json.dumps(response).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+def ndjson_handler(rows, compress=False, log=None):
+    r"""A handler that answers every GET with rows as an NDJSON body, gzip-compressed if compress is
+    set and the client accepts it, and appends each request's headers to log."""
+    body = "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if log is not None:
+                log.append(self.headers)
+            response = body
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            if compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+                response = gzip.compress(body)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+EVENT_ROWS = [
+    {"event.name": "boot", "event.timestamp": 1700000000000000000, "timeline.name": "tl",
+     "timeline.receive_time": 1700000000100000000, "segment.latest_receive_time": 1700000000200000000,
+     "event.is_failure": False, "event.count": 3, "event.ratio": 0.5, "event.created_at": 5},
+    {"event.name": "run", "event.timestamp": 1700000001000000000, "timeline.name": "tl",
+     "timeline.receive_time": 1700000001100000000, "segment.latest_receive_time": None,
+     "event.is_failure": True, "event.count": None, "event.ratio": 1.5, "event.created_at": 6},
+]
+
+# Tagged attr values whose tags vary between rows, and list values
+NESTED_EVENT_ROWS = [
+    dict(EVENT_ROWS[0], **{"event.attr": {"BigInt": "123"}, "event.coordinates": {"EventCoordinate": "0123"},
+                           "event.logical_time": [1, 2]}),
+    dict(EVENT_ROWS[1], **{"event.attr": {"TimelineId": "abc"}, "event.coordinates": {"EventCoordinate": "0124"},
+                           "event.logical_time": [3]}),
+]
 
 def test_events_data_frame_url_test():
     m = auxon_sdk.client.Modality()
@@ -61,3 +161,264 @@ def test_event_value_distributions_data_frame_url_test():
 
     u = m._event_value_distributions_data_frame_url(include_attrs = ["event.a", "event.b"])
     assert u == "http://localhost:14181/v1/inspection/event_value_distributions_data_frame?include_attrs=event.a&include_attrs=event.b"
+
+# Columns that Arrow would read differently from pandas, each with a value per row
+DIVERGENT_COLUMNS = [
+    # A string that looks like a date, in a column that isn't date-like
+    {"event.msg": ["2020-01-01", "2020-01-02"]},
+    # An ISO-8601 string in a date-like column
+    {"event.created_at": ["2020-01-01T00:00:00", "2020-01-02T00:00:00"]},
+    # Epoch seconds and milliseconds in date-like columns
+    {"event.created_at": [1700000000, 1700000001]},
+    {"segment.latest_receive_time": [1700000000000, None]},
+    # A u64 too large for int64
+    {"event.big": [18446744073709551615, 1]},
+    {"event.empty": [None, None]},
+    {"event.flag": [True, None]},
+]
+
+@pytest.mark.parametrize("rows", [EVENT_ROWS, NESTED_EVENT_ROWS] + [
+    [dict(row, **{name: values[i] for name, values in columns.items()}) for i, row in enumerate(EVENT_ROWS)]
+    for columns in DIVERGENT_COLUMNS
+])
+def test_arrow_reader_matches_pandas_reader(rows):
+    pytest.importorskip("pyarrow")
+    dtypes = auxon_sdk.client._TIMESTAMP_DTYPES
+
+    with local_modality(ndjson_handler(rows)) as m:
+        url = m._events_data_frame_url()
+        with m._open_json_lines(url, {}) as response:
+            expected = m._read_json_lines_in_chunks(response, dtypes, 1000)
+        actual = m._read_json_lines_with_arrow(url, {}, dtypes, 1000)
+
+    pandas.testing.assert_frame_equal(actual, expected)
+    assert actual["timeline.receive_time"].dtype == "datetime64[ns]"
+
+@pytest.mark.parametrize("chunksize", [1, 1000])
+def test_read_json_lines_in_chunks_matches_single_pass(chunksize):
+    # A timestamp too small to be converted to a date in one chunk only
+    rows = [dict(EVENT_ROWS[0]), dict(EVENT_ROWS[1], **{"timeline.receive_time": 5})]
+    body = "".join(json.dumps(row) + "\n" for row in rows).encode()
+    dtypes = auxon_sdk.client._TIMESTAMP_DTYPES
+    expected = pandas.read_json(io.BytesIO(body), lines=True, dtype=dtypes)
+
+    with local_modality(ndjson_handler(rows)) as m:
+        with m._open_json_lines(m._events_data_frame_url(), {}) as response:
+            actual = m._read_json_lines_in_chunks(response, dtypes, chunksize)
+
+    pandas.testing.assert_frame_equal(actual, expected)
+    assert actual["timeline.receive_time"].dtype == "int64"
+
+def test_default_attrs_read_only():
+    attrs = auxon_sdk.client.Modality.default_attrs
+
+    with pytest.raises(TypeError):
+        attrs["EVENT"] = {}
+    with pytest.raises(TypeError):
+        attrs["EVENT"]["NAME"] = "event.other_name"
+    with pytest.raises(TypeError):
+        attrs["EVENT"].update(NAME="event.other_name")
+
+    # Copies are mutable dicts
+    deep = copy.deepcopy(attrs)
+    assert deep == attrs
+    deep["EVENT"]["NAME"] = "event.other_name"
+    assert attrs["EVENT"]["NAME"] == "event.name"
+    shallow = copy.copy(attrs)
+    shallow["EXTRA"] = {}
+    assert "EXTRA" not in attrs
+
+    assert pickle.loads(pickle.dumps(attrs)) == attrs
+    assert json.loads(json.dumps(attrs)) == attrs
+
+def test_connection_settings_assignment():
+    m = auxon_sdk.client.Modality("http://example.com:14181/v1", auth_token="a")
+    assert m._base_headers["X-Auxon-Auth-Token"] == "a"
+
+    m.auth_token = "b"
+    assert m._auth_headers == {"X-Auxon-Auth-Token": "b"}
+    assert m._base_headers["X-Auxon-Auth-Token"] == "b"
+
+    m._ws_version_cache["default"] = "12345"
+    m.modality_url = "http://other.example.com:14181/v1"
+    assert m._modality_url("experiment/get_experiment") == "http://other.example.com:14181/v1/experiment/get_experiment"
+    assert m._http._host == "other.example.com"
+    u = m._events_data_frame_url(workspace_name="default")
+    assert u == "http://other.example.com:14181/v1/inspection/events_data_frame?workspace_name=default"
+    assert m._ws_version_cache == {}
+    assert m._base_headers["X-Auxon-Auth-Token"] == "b"
+
+def test_missing_modality_url(monkeypatch, tmp_path):
+    appdirs = pytest.importorskip("appdirs")
+    pytest.importorskip("toml")
+    monkeypatch.setattr(appdirs, "user_config_dir", lambda name: str(tmp_path / name))
+
+    class NoUrlModality(auxon_sdk.client.Modality):
+        modality_url = None
+
+    with pytest.raises(ValueError, match="modality_url"):
+        NoUrlModality(auth_token="a")
+
+    m = auxon_sdk.client.Modality("http://example.com:14181/v1", auth_token="a")
+    with pytest.raises(ValueError, match="modality_url"):
+        m.modality_url = None
+
+def test_connection_pool_reuses_connections():
+    log = []
+    with local_modality(rpc_handler(lambda path, request: {"Ok": request}, log)) as m:
+        for i in range(3):
+            assert m._post_json("test/echo", {"i": i}) == {"Ok": {"i": i}}
+
+    assert [request for _, _, _, request in log] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    # All over one keep-alive connection
+    assert len({port for _, _, port, _ in log}) == 1
+
+def test_connection_pool_retries_stale_connections():
+    log = []
+    with local_modality(rpc_handler(lambda path, request: {"Ok": request}, log, keep_alive=False)) as m:
+        for i in range(3):
+            assert m._post_json("test/echo", {"i": i}) == {"Ok": {"i": i}}
+
+    # Each request is sent once, over a new connection
+    assert [request for _, _, _, request in log] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert len({port for _, _, port, _ in log}) == 3
+
+def test_connection_pool_follows_redirects():
+    log = []
+
+    class Handler(rpc_handler(lambda path, request: {"Ok": request}, log)):
+        def do_POST(self):
+            if self.path == "/v1/test/old":
+                self.rfile.read(int(self.headers["Content-Length"]))
+                log.append(("POST", self.path, self.client_address[1], None))
+                self.send_response(303)
+                self.send_header("Location", "/v1/test/new")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                super().do_POST()
+
+        def do_GET(self):
+            log.append(("GET", self.path, self.client_address[1], None))
+            self.send_json({"Ok": "moved"})
+
+    with local_modality(Handler) as m:
+        assert m._post_json("test/old", {}) == {"Ok": "moved"}
+
+    assert [(method, path) for method, path, _, _ in log] == [("POST", "/v1/test/old"), ("GET", "/v1/test/new")]
+
+def test_connection_pool_uses_proxy(monkeypatch):
+    log = []
+    with local_server(rpc_handler(lambda path, request: {"Ok": request}, log)) as proxy_url:
+        for name in ("no_proxy", "NO_PROXY"):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv("http_proxy", proxy_url)
+        m = auxon_sdk.client.Modality("http://modality.invalid:14181/v1", auth_token="test-token")
+        assert m._post_json("test/echo", {"i": 0}) == {"Ok": {"i": 0}}
+
+    # A proxy is sent the absolute URL
+    assert [path for _, path, _, _ in log] == ["http://modality.invalid:14181/v1/test/echo"]
+
+def test_connection_pool_timeout():
+    m = auxon_sdk.client.Modality("http://example.com:14181/v1", timeout=5)
+    assert m._http._new_connection().timeout == 5
+
+def test_query_string_memo_distinguishes_types():
+    m = auxon_sdk.client.Modality()
+    url = "http://localhost:14181/v1/inspection/events_data_frame?"
+
+    for _ in range(2):
+        assert m._events_data_frame_url(workspace_version_id=1) == url + "workspace_version_id=1"
+        assert m._events_data_frame_url(workspace_version_id=True) == url + "workspace_version_id=True"
+        assert m._events_data_frame_url(workspace_version_id=1.0) == url + "workspace_version_id=1.0"
+        assert m._events_data_frame_url(segments=[1]) == url + "segments=1"
+        assert m._events_data_frame_url(segments=[True]) == url + "segments=True"
+        assert m._events_data_frame_url(segments=({"a": 1},)) == url + "segments=%7B%27a%27%3A+1%7D"
+
+@pytest.mark.parametrize("kwargs, scope", [
+    ({}, {"Global": {"timeline_filter": None}}),
+    ({"timeline_filter": "_.name = 'a'"}, {"Global": {"timeline_filter": "_.name = 'a'"}}),
+    ({"segments": [{"name": "s"}], "workspace_name": "w", "only_newest_segment_in_workspace": True},
+     {"WorkspaceSegments": {"timeline_filter": None, "segments": [{"name": "s"}]}}),
+    ({"workspace_name": "w"}, {"Workspace": {"timeline_filter": None, "workspace": {"Name": "w"}}}),
+    ({"workspace_version_id": "v"}, {"Workspace": {"timeline_filter": None, "workspace": {"Version": "v"}}}),
+    ({"workspace_name": "w", "workspace_version_id": "v"},
+     {"Workspace": {"timeline_filter": None, "workspace": {"Version": "v"}}}),
+    ({"workspace_name": "w", "only_newest_segment_in_workspace": True, "timeline_filter": "f"},
+     {"NewestSegmentInWorkspace": {"timeline_filter": "f", "workspace": {"Name": "w"}}}),
+    ({"workspace_version_id": "v", "only_newest_segment_in_workspace": True},
+     {"NewestSegmentInWorkspace": {"timeline_filter": None, "workspace": {"Version": "v"}}}),
+])
+def test_build_scope(kwargs, scope):
+    assert auxon_sdk.client._build_scope(**kwargs) == scope
+
+def test_build_scope_newest_segment_requires_workspace():
+    with pytest.raises(ValueError):
+        auxon_sdk.client._build_scope(only_newest_segment_in_workspace=True)
+
+def test_experiment_overviews_order():
+    names = ["e{}".format(i) for i in range(6)]
+
+    def respond(path, request):
+        # Answer later requests sooner, so responses complete out of order
+        time.sleep(0.05 * (len(names) - names.index(request["name"])))
+        return {"Ok": {"name": request["name"], "scope": request["scope"]}}
+
+    log = []
+    with local_modality(rpc_handler(respond, log)) as m:
+        overviews = m.experiment_overviews(names, workspace_name="w", max_workers=len(names))
+
+    scope = {"Workspace": {"timeline_filter": None, "workspace": {"Name": "w"}}}
+    assert overviews == [{"Ok": {"name": name, "scope": scope}} for name in names]
+    assert {path for _, path, _, _ in log} == {"/v1/experiment/get_experiment"}
+
+def test_workspace_version_cache():
+    versions = iter(["v1", "v2"])
+
+    def respond(path, request):
+        if path == "/v1/workspace/get_workspace_definition":
+            return {"Ok": {"version": next(versions)}}
+        return {"Ok": {"segments": [{"workspace_version_id": request["workspace_version_id"]}]}}
+
+    log = []
+    with local_modality(rpc_handler(respond, log)) as m:
+        # The second lookup is served from the cache
+        assert m.workspace_segments(workspace_name="w") == [{"workspace_version_id": "v1"}]
+        assert m.workspace_segments(workspace_name="w") == [{"workspace_version_id": "v1"}]
+        m.invalidate_workspace_cache()
+        assert m.workspace_segments(workspace_name="w") == [{"workspace_version_id": "v2"}]
+
+    assert [path for _, path, _, _ in log] == [
+        "/v1/workspace/get_workspace_definition", "/v1/inspection/list_workspace_segments",
+        "/v1/inspection/list_workspace_segments",
+        "/v1/workspace/get_workspace_definition", "/v1/inspection/list_workspace_segments",
+    ]
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_events_data_frame_compression(compress):
+    log = []
+    with local_modality(ndjson_handler(EVENT_ROWS, compress, log)) as m:
+        df = m.events_data_frame(workspace_name="w")
+
+    assert log[0]["Accept-Encoding"] == "gzip"
+    assert log[0]["X-Auxon-Auth-Token"] == "test-token"
+    assert df["event.name"].tolist() == ["boot", "run"]
+    assert df["event.timestamp"].dtype == "datetime64[ns]"
+
+def test_events_data_frame_epoch_seconds():
+    rows = [dict(row, **{"event.created_at": 1700000000}) for row in EVENT_ROWS]
+    with local_modality(ndjson_handler(rows)) as m:
+        df = m.events_data_frame(workspace_name="w")
+
+    assert df["event.created_at"].dtype.kind == "M"
+    assert df["event.created_at"][0] == pandas.Timestamp("2023-11-14 22:13:20")
+
+def test_iter_events_data_frame_chunks():
+    rows = [{"event.name": "e{}".format(i), "event.timestamp": 1700000000000000000 + i} for i in range(5)]
+    with local_modality(ndjson_handler(rows, compress=True)) as m:
+        chunks = list(m.iter_events_data_frame(workspace_name="w", chunksize=2))
+
+    assert [chunk.shape for chunk in chunks] == [(2, 2), (2, 2), (1, 2)]
+    df = pandas.concat(chunks, ignore_index=True)
+    assert df["event.name"].tolist() == ["e0", "e1", "e2", "e3", "e4"]
+    assert all(chunk["event.timestamp"].dtype == "datetime64[ns]" for chunk in chunks)
@@ -1,6 +1,7 @@
 import auxon_sdk as auxon
 from dataclasses import dataclass
 import os
+import pytest
 import tempfile
 import unittest
 
@@ -37,6 +38,28 @@ def test_basic_ingest():
     assert status.current_timeline == tl
     assert status.events_received == 2
 
+@unittest.skip("This is exercised by the integration tests")
+def test_send_event_with_schema():
+    cfg = auxon.PluginConfig(SimpleConfig, "TEST_")
+    c = cfg.connect_and_authenticate_ingest()
+
+    tl = auxon.TimelineId.allocate()
+    c.switch_timeline(tl)
+    schema = c.prepare_event_schema(["q", "r"])
+    c.send_event_with_schema("ev1", 1, schema, (1, "whee"))
+    c.send_event_with_schema("ev2", 2, schema, [1, "yo"])
+
+    # The number of values must match the schema
+    with pytest.raises(ValueError):
+        c.send_event_with_schema("ev3", 3, schema, (1,))
+    with pytest.raises(ValueError):
+        c.send_event_with_schema("ev3", 3, schema, (1, "hey", 2))
+
+    c.flush()
+    status = c.status()
+    assert status.current_timeline == tl
+    assert status.events_received == 2
+
 def test_env_var_config():
     cfg = auxon.PluginConfig(SimpleConfig, "TEST_")
     assert cfg.plugin == SimpleConfig(
@@ -153,3 +176,30 @@ def test_config_file():
             base_float_val = 3000.14,
             base_bool_val = True,
         )
+
+def test_config_source(monkeypatch):
+    # monkeypatch restores the environment afterwards, for the tests that follow
+    for key in [k for k in os.environ if k.startswith("TEST_")]:
+        monkeypatch.delenv(key)
+
+    # config_source takes the place of the file named by MODALITY_REFLECTOR_CONFIG
+    monkeypatch.setenv("MODALITY_REFLECTOR_CONFIG", "/nonexistent/reflector-config.toml")
+
+    cfg = auxon.PluginConfig(SimpleConfig, "TEST_", config_source = config_content)
+    assert cfg.plugin == SimpleConfig(
+        str_val = "str",
+        int_val = 42,
+        float_val = 3.14,
+        bool_val = True,
+        base_str_val = "bstr",
+        base_int_val = 420,
+        base_float_val = 30.14,
+        base_bool_val = False,
+    )
+
+    # env vars still override it
+    monkeypatch.setenv("TEST_INT_VAL", "4200")
+
+    cfg = auxon.PluginConfig(SimpleConfig, "TEST_", config_source = config_content)
+    assert cfg.plugin.int_val == 4200
+    assert cfg.plugin.str_val == "str"
@@ -92,6 +92,7 @@ use std::{
     env,
     path::{Path, PathBuf},
     str::FromStr as _,
+    sync::Mutex,
     time::Duration,
 };
 use url::Url;
@@ -196,32 +197,45 @@ impl<T: Serialize + DeserializeOwned> Config<T> {
 
         // load from MODALITY_REFLECTOR_CONFIG
         if let Ok(env_path) = env::var(CONFIG_ENV_VAR) {
-            let path = Path::new(&env_path);
-
-            // Look at the file content to determine which section should be used.
-            let content = &std::fs::read_to_string(path)?;
-            let mut raw_toml: crate::reflector_config::raw_toml::Config =
-                toml::from_str(content).map_err(|e| ConfigLoadError::ConfigFileToml {
-                    path: path.to_owned(),
-                    error: e,
-                })?;
-
-            // The 'metadata' entry is set up by the reflector on behalf of whatever plugin it's running,
-            // so prefer it if it's present.
-            if raw_toml.metadata.is_empty() {
-                // if not, find the right plugin section and copy it to the top level
-                copy_relevant_plugin_section_to_top_level_metadata(&mut raw_toml)?;
-            }
-
-            let r: Result<crate::reflector_config::Config, SemanticErrorExplanation> =
-                raw_toml.try_into();
-            cfg = Some(r.map_err(|semantics| ConfigLoadError::DefinitionSemantics {
-                explanation: semantics.0,
-            })?);
+            cfg = Some(load_config_file(Path::new(&env_path))?);
         }
 
-        let cfg = cfg.unwrap_or_default();
+        Self::merge_env(cfg.unwrap_or_default(), env_prefix, map_env_val)
+    }
+
+    /// Load configuration, like [Config::load_custom], but take the
+    /// config file content from `config_source` instead of reading
+    /// the file named by `MODALITY_REFLECTOR_CONFIG`. Environment
+    /// variables are applied in the same way.
+    pub fn load_custom_from_str(
+        env_prefix: &str,
+        config_source: &str,
+        map_env_val: impl Fn(
+            &str,
+            &str,
+        ) -> Result<
+            Option<(String, TomlValue)>,
+            Box<dyn std::error::Error + Send + Sync>,
+        >,
+    ) -> Result<Config<T>, Box<dyn std::error::Error + Send + Sync>> {
+        let raw_toml: crate::reflector_config::raw_toml::Config =
+            toml::from_str(config_source).map_err(|e| ConfigLoadError::ConfigToml { error: e })?;
+        let cfg = refine_raw_config(raw_toml)?;
+
+        Self::merge_env(cfg, env_prefix, map_env_val)
+    }
 
+    fn merge_env(
+        cfg: crate::reflector_config::Config,
+        env_prefix: &str,
+        map_env_val: impl Fn(
+            &str,
+            &str,
+        ) -> Result<
+            Option<(String, TomlValue)>,
+            Box<dyn std::error::Error + Send + Sync>,
+        >,
+    ) -> Result<Config<T>, Box<dyn std::error::Error + Send + Sync>> {
         let mut ingest = cfg.ingest.clone().unwrap_or_default();
         override_ingest_config_from_env(&mut ingest)?;
 
@@ -329,6 +343,60 @@ impl<T: Serialize + DeserializeOwned> Config<T> {
     }
 }
 
+lazy_static::lazy_static! {
+    /// The most recently loaded config file: its path, its content, and
+    /// the parsed config. Loading the same unchanged file again (e.g. when
+    /// a process constructs several plugin configs) reuses the parsed
+    /// config instead of parsing the toml again.
+    static ref CONFIG_FILE_CACHE: Mutex<Option<(PathBuf, String, crate::reflector_config::Config)>> =
+        Mutex::new(None);
+}
+
+fn load_config_file(
+    path: &Path,
+) -> Result<crate::reflector_config::Config, Box<dyn std::error::Error + Send + Sync>> {
+    let content = std::fs::read_to_string(path)?;
+
+    if let Some((cached_path, cached_content, cached_cfg)) = CONFIG_FILE_CACHE
+        .lock()
+        .unwrap_or_else(|e| e.into_inner())
+        .as_ref()
+    {
+        if cached_path == path && *cached_content == content {
+            return Ok(cached_cfg.clone());
+        }
+    }
+
+    let raw_toml: crate::reflector_config::raw_toml::Config =
+        toml::from_str(&content).map_err(|e| ConfigLoadError::ConfigFileToml {
+            path: path.to_owned(),
+            error: e,
+        })?;
+    let cfg = refine_raw_config(raw_toml)?;
+
+    *CONFIG_FILE_CACHE.lock().unwrap_or_else(|e| e.into_inner()) =
+        Some((path.to_owned(), content, cfg.clone()));
+
+    Ok(cfg)
+}
+
+fn refine_raw_config(
+    mut raw_toml: crate::reflector_config::raw_toml::Config,
+) -> Result<crate::reflector_config::Config, Box<dyn std::error::Error + Send + Sync>> {
+    // Look at the content to determine which section should be used.
+    // The 'metadata' entry is set up by the reflector on behalf of whatever plugin it's running,
+    // so prefer it if it's present.
+    if raw_toml.metadata.is_empty() {
+        // if not, find the right plugin section and copy it to the top level
+        copy_relevant_plugin_section_to_top_level_metadata(&mut raw_toml)?;
+    }
+
+    let r: Result<crate::reflector_config::Config, SemanticErrorExplanation> = raw_toml.try_into();
+    Ok(r.map_err(|semantics| ConfigLoadError::DefinitionSemantics {
+        explanation: semantics.0,
+    })?)
+}
+
 /// We don't have a 'metadata' section, so we might be dealing with a reflector-style config file. Here we pull the confiruation from
 /// one of the 'plugin.*' sections based on sniffing the executable name, and put that data in the 'metadata' section, so the caller
 /// can find it all in that one place.
@@ -1009,4 +1077,105 @@ val = 42
         env::remove_var("TEST_VAL");
         clear_relevant_env_vars();
     }
+
+    #[test]
+    #[serial_test::serial]
+    fn load_config_from_str() {
+        env::remove_var("TEST_VAL");
+        clear_relevant_env_vars();
+
+        let content = "
+[ingest]
+protocol-parent-url = 'modality-ingest-tls://auxon.io:9077'
+
+[metadata]
+val = 42
+";
+        let cfg = Config::<CustomConfig>::load_custom_from_str("TEST_", content, |_, _| Ok(None))
+            .unwrap();
+        assert_eq!(
+            cfg.ingest.protocol_parent_url,
+            Url::parse("modality-ingest-tls://auxon.io:9077").ok()
+        );
+        assert_eq!(cfg.plugin.val, Some(42));
+
+        // The file named by MODALITY_REFLECTOR_CONFIG isn't read, and env vars still override
+        // the given content
+        env::set_var(
+            "MODALITY_REFLECTOR_CONFIG",
+            "/nonexistent/reflector-config.toml",
+        );
+        env::set_var("MODALITY_INGEST_URL", "modality-ingest://foo");
+        env::set_var("TEST_VAL", "99");
+
+        let cfg = Config::<CustomConfig>::load_custom_from_str("TEST_", content, |_, _| Ok(None))
+            .unwrap();
+        assert_eq!(
+            cfg.ingest.protocol_parent_url,
+            Url::parse("modality-ingest://foo").ok()
+        );
+        assert_eq!(cfg.plugin.val, Some(99));
+
+        env::remove_var("TEST_VAL");
+        clear_relevant_env_vars();
+    }
+
+    #[test]
+    #[serial_test::serial]
+    fn load_config_from_invalid_str() {
+        clear_relevant_env_vars();
+
+        let err =
+            Config::<CustomConfig>::load_custom_from_str("TEST_", "[metadata", |_, _| Ok(None))
+                .err()
+                .expect("invalid toml should fail to load");
+        assert!(matches!(
+            err.downcast_ref::<ConfigLoadError>(),
+            Some(ConfigLoadError::ConfigToml { .. })
+        ));
+    }
+
+    #[test]
+    #[serial_test::serial]
+    fn config_file_cache() {
+        let mut tmpfile = tempfile::NamedTempFile::new().unwrap();
+        write!(tmpfile, "[metadata]\nval = 42\n").unwrap();
+
+        let cfg = load_config_file(tmpfile.path()).unwrap();
+        assert_eq!(cfg.metadata.get("val"), Some(&TomlValue::Integer(42)));
+
+        // Mark the cached config, to tell whether it's reused or the file is parsed again
+        let mut marked = cfg.clone();
+        marked
+            .metadata
+            .insert("cached".to_owned(), TomlValue::Boolean(true));
+        CONFIG_FILE_CACHE
+            .lock()
+            .unwrap_or_else(|e| e.into_inner())
+            .as_mut()
+            .unwrap()
+            .2 = marked.clone();
+
+        // Unchanged content is served from the cache
+        assert_eq!(load_config_file(tmpfile.path()).unwrap(), marked);
+
+        // Changed content is parsed again
+        write!(tmpfile, "other = 1\n").unwrap();
+        let cfg = load_config_file(tmpfile.path()).unwrap();
+        assert_eq!(cfg.metadata.get("val"), Some(&TomlValue::Integer(42)));
+        assert_eq!(cfg.metadata.get("other"), Some(&TomlValue::Integer(1)));
+        assert!(!cfg.metadata.contains_key("cached"));
+
+        // So is the same content in another file
+        let mut other_tmpfile = tempfile::NamedTempFile::new().unwrap();
+        write!(other_tmpfile, "[metadata]\nval = 42\nother = 1\n").unwrap();
+        CONFIG_FILE_CACHE
+            .lock()
+            .unwrap_or_else(|e| e.into_inner())
+            .as_mut()
+            .unwrap()
+            .2 = marked.clone();
+        let cfg = load_config_file(other_tmpfile.path()).unwrap();
+        assert!(!cfg.metadata.contains_key("cached"));
+    }
 }
@@ -248,7 +248,7 @@ impl Client {
             *ik
         } else {
             let ik = self.inner.declare_attr_key(key.clone()).await?;
-            self.timeline_keys.insert(key, ik);
+            self.event_keys.insert(key, ik);
             ik
         };
 
@@ -1068,7 +1068,6 @@ pub enum ConfigLoadError {
         #[source]
         error: toml::de::Error,
     },
-    #[allow(unused)]
     #[error("Error in config content relating to TOML parsing. {error}")]
     ConfigToml {
         #[source]